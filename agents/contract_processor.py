@@ -1,131 +1,414 @@
+import asyncio
+import hashlib
+import httpx
+from functools import lru_cache
+from aiolimiter import AsyncLimiter
+from openai import AsyncOpenAI, OpenAI
 from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Type
 from agno.agent import Agent
+from agno.run.response import RunResponse
 from agno.models.openai import OpenAIChat
 from agno.models.deepseek import DeepSeek
-from models import Contract, ProcessingResponse, Clause
+from pydantic import BaseModel, ValidationError
+from models import Contract, ContractMetadata, ProcessingResponse, Clause, ClauseClassificationList, ClauseList
+from agents.prompts import (
+    CLASSIFICATION_PROMPT,
+    CLAUSE_PROMPT,
+    GENERATION_PROMPT,
+    METADATA_PROMPT,
+    SUMMARY_PROMPT
+)
+from utils.batch_api import run_chat_batch
+from utils.entities import extract_entities
+from utils.llm_cache import ResponseCache
 from utils.pdf_parser import PDFParser
 from utils.helpers import get_logger
-import json
+import logging
+import orjson
 
 logger = get_logger(__name__)
 
-class CustomDeepSeek(DeepSeek):
-    def process_response(self, response: str) -> str:
-        """Clean markdown formatting from response"""
-        if response.startswith('```'):
-            lines = response.split('\n')
-            content = '\n'.join(lines[1:-1])
-            if content.startswith('json'):
-                content = content[4:]
-            return content.strip()
-        return response
+# Upper bound on in-flight LLM calls of every stage, keeps us under provider rate limits
+MAX_CONCURRENCY = 8
 
-class ContractProcessingAgent:
-    def __init__(self, openai_api_key: str, deepseek_api_key: str):
-        self.pdf_parser = PDFParser()
+# Clauses packed into one classification call; latency grows sub-linearly up to ~10-20
+CLASSIFICATION_BATCH_SIZE = 10
 
-        # OpenAI configuration for heavy processing
-        openai_config = OpenAIChat(
-            id="gpt-4o",
+DEEPSEEK_BASE_URL = "https://api.aimlapi.com/v1"
+
+# Processed contracts remembered per processor, keyed by normalized text
+RESULT_CACHE_SIZE = 256
+
+# The OpenAI SDK, used for DeepSeek too, retries 429/5xx responses with exponential
+# backoff, honouring Retry-After
+OPENAI_MAX_RETRIES = 5
+OPENAI_TIMEOUT = httpx.Timeout(180.0, connect=5.0)
+
+
+class CallLimiter:
+    """Bounds in-flight LLM calls and, optionally, how many start per minute"""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, rpm: Optional[int] = None):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = AsyncLimiter(rpm, 60) if rpm else None
+
+    async def __aenter__(self) -> "CallLimiter":
+        await self.semaphore.acquire()
+        if self.rate_limiter:
+            try:
+                await self.rate_limiter.acquire()
+            except BaseException:
+                self.semaphore.release()
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.semaphore.release()
+
+
+def contract_text_key(text: str) -> str:
+    """Hash contract text with whitespace normalized, so re-extracted copies match"""
+    return hashlib.blake2b(" ".join(text.split()).encode(), digest_size=16).hexdigest()
+
+
+def _content(result: Any) -> Any:
+    """Unwrap an agent RunResponse to its content"""
+    return getattr(result, "content", result)
+
+
+def _parsed(result: Any, response_model: Type[BaseModel]) -> Any:
+    """Unwrap a structured agent response, failing clearly if it did not parse"""
+    content = _content(result)
+    if not isinstance(content, response_model):
+        raise ValueError(f"Model response did not match {response_model.__name__}")
+    return content
+
+
+@lru_cache(maxsize=None)
+def response_schema_json(response_model: Type[BaseModel]) -> str:
+    """JSON schema of a response model, serialized once per model class"""
+    return orjson.dumps(response_model.model_json_schema(), option=orjson.OPT_INDENT_2).decode()
+
+
+def create_http_client() -> httpx.Client:
+    """Create a keep-alive connection pool sized for concurrent LLM calls"""
+    # HTTP/2 multiplexes concurrent calls to one host over a single TLS connection
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=OPENAI_TIMEOUT
+    )
+
+class ContractProcessingAgent:
+    def __init__(
+        self,
+        openai_api_key: str,
+        deepseek_api_key: str,
+        http_client: Optional[httpx.Client] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        llm_cache_dir: Optional[Path] = None,
+        parse_cache_dir: Optional[Path] = None
+    ):
+        # Parsed text stays in memory only, unless a bulk or dev caller opts into a disk cache
+        self.pdf_parser = PDFParser(cache_dir=parse_cache_dir)
+        self.max_concurrency = max_concurrency
+        # Opt-in for development: re-running identical prompts reads responses from disk
+        self.llm_cache = ResponseCache(llm_cache_dir) if llm_cache_dir else None
+        self.result_cache: Dict[Tuple[str, bool, bool], ProcessingResponse] = {}
+        self.pending_results: Dict[Tuple[str, bool, bool], asyncio.Future] = {}
+        # Callers awaiting each shared pipeline, so it is cancelled once none are left
+        self.pending_waiters: Dict[asyncio.Future, int] = {}
+
+        # One pooled HTTP client keeps TLS connections alive between pipeline calls;
+        # pass a shared client to reuse the pool across processor instances
+        self.owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client()
+        self.openai_client = OpenAI(
             api_key=openai_api_key,
-            temperature=0.0
+            http_client=self.http_client,
+            max_retries=OPENAI_MAX_RETRIES,
+            timeout=OPENAI_TIMEOUT
         )
 
-        # DeepSeek configuration for lighter tasks
-        deepseek_config = CustomDeepSeek(
+        # DeepSeek configuration for lighter tasks, on the same connection pool
+        self.deepseek_client = OpenAI(
+            api_key=deepseek_api_key,
+            base_url=DEEPSEEK_BASE_URL,
+            http_client=self.http_client,
+            max_retries=OPENAI_MAX_RETRIES,
+            timeout=OPENAI_TIMEOUT
+        )
+        # json_object mode guarantees a bare JSON reply, with no markdown fences to strip
+        self.deepseek_config = DeepSeek(
             id="deepseek-chat",
-            base_url="https://api.aimlapi.com/v1",
+            base_url=DEEPSEEK_BASE_URL,
             api_key=deepseek_api_key,
-            response_format={"type": "json"}
+            response_format={"type": "json_object"},
+            client=self.deepseek_client
+        )
+
+    def close(self) -> None:
+        """Close the connection pool, unless it was passed in and is shared"""
+        if self.owns_http_client:
+            self.http_client.close()
+
+    def openai_model(self, async_client: Optional[AsyncOpenAI] = None) -> OpenAIChat:
+        """OpenAI configuration for heavy processing.
+
+        Agents write their response format onto the model before each run, so
+        every agent gets its own model; they all share the pooled client.
+        """
+        return OpenAIChat(
+            id="gpt-4o",
+            api_key=self.openai_client.api_key,
+            temperature=0.0,
+            client=self.openai_client,
+            async_client=async_client
         )
 
-        # Document Parsing Agent
-        self.parsing_agent = Agent(
+    async def _arun(self, agent: Agent, prompt: str, limiter: CallLimiter):
+        """Run an agent off the event loop, gated by the pipeline's call limiter"""
+        if self.llm_cache:
+            key = self.llm_cache.key(agent, prompt)
+            cached = self.llm_cache.get(agent, key)
+            if cached is not None:
+                return RunResponse(content=cached)
+
+        async with limiter:
+            # agent.run reuses the pooled HTTP client; agno's arun would open a new one per call
+            result = await asyncio.to_thread(agent.run, prompt)
+        if self.llm_cache:
+            self.llm_cache.put(agent, key, result.content)
+        return result
+
+    # Agents are built per run rather than once per processor: agno keeps the
+    # run response and a growing message memory on the instance, so an agent
+    # shared by concurrently processed contracts could return another run's
+    # result. Construction is cheap since every model reuses the pooled client.
+    def build_parsing_agent(self) -> Agent:
+        """Create a Document Parsing Agent"""
+        return Agent(
             name="Document Parser",
             role="Document parsing specialist",
-            model=openai_config,
+            model=self.openai_model(),
             instructions=["Extract contract metadata and structure"],
             show_tool_calls=True,
-            response_model=Contract,
+            response_model=ContractMetadata,
             structured_outputs=True,
         )
 
-        # Clause Extraction Agent
-        self.clause_agent = Agent(
+    def build_clause_agent(self) -> Agent:
+        """Create a Clause Extraction Agent"""
+        return Agent(
             name="Clause Extractor",
             role="Contract clause extraction specialist",
-            model=openai_config,
+            model=self.openai_model(),
             instructions=["Identify and extract individual contract clauses"],
             show_tool_calls=True,
-            response_model=Clause,
-            structured_outputs=True,
-        )
-
-        # Clause Classification Agent
-        self.classification_agent = Agent(
-            name="Clause Classifier",
-            role="Contract clause classification specialist",
-            model=deepseek_config,
-            instructions=["Classify contract clauses into standard categories"],
-            show_tool_calls=True,
-            response_model=Clause,
+            response_model=ClauseList,
             structured_outputs=True,
         )
 
-        # NER Agent
-        self.ner_agent = Agent(
-            name="NER Processor",
-            role="Named Entity Recognition specialist",
-            model=openai_config,
-            instructions=["Extract dates, amounts, and named entities from clauses"],
-            show_tool_calls=True,
-            response_model=Clause,
-            structured_outputs=True,
-        )
-
-        # Clause Generation Agent
-        self.generation_agent = Agent(
+    def build_generation_agent(self) -> Agent:
+        """Create a Clause Generation Agent"""
+        return Agent(
             name="Clause Generator",
             role="Contract clause improvement specialist",
-            model=openai_config,
+            model=self.openai_model(),
             instructions=["Generate improved versions of contract clauses"],
             show_tool_calls=True,
-            response_model=Clause,
+            response_model=ClauseList,
             structured_outputs=True
         )
 
-        # Summarization Agent
-        self.summary_agent = Agent(
+    def build_summary_agent(self, async_client: Optional[AsyncOpenAI] = None) -> Agent:
+        """Create a Summarization Agent"""
+        return Agent(
             name="Contract Summarizer",
             role="Contract summarization specialist",
-            model=openai_config,
-            instructions=["Create concise summaries of full contracts"],
-            show_tool_calls=True,
-            response_model=Contract,
-            structured_outputs=True
+            model=self.openai_model(async_client),
+            instructions=[
+                "Create concise summaries of full contracts",
+                "Respond in Markdown prose, never JSON"
+            ],
+            show_tool_calls=True
         )
 
-        # Agent Team
-        self.agent_team = Agent(
-            name="Contract Processing Team",
-            role="Contract analysis coordination",
-            model=openai_config,
-            team=[
-                self.parsing_agent,
-                self.clause_agent,
-                self.classification_agent,
-                self.ner_agent,
-                self.generation_agent,
-                self.summary_agent
-            ],
-            instructions=["Coordinate contract analysis workflow"],
+    def build_classification_agent(self) -> Agent:
+        """Create a Clause Classification Agent"""
+        return Agent(
+            name="Clause Classifier",
+            role="Contract clause classification specialist",
+            model=self.deepseek_config,
+            instructions=["Classify contract clauses into standard categories"],
             show_tool_calls=True,
-            response_model=ProcessingResponse,
-            structured_outputs=True
+            response_model=ClauseClassificationList,
+            # DeepSeek rejects JSON-schema response formats; agno falls back to
+            # json_object mode and puts the schema in the system prompt instead
+            structured_outputs=False,
+        )
+
+    async def aclassify_clauses(
+        self,
+        clauses: List[Clause],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        limiter: Optional[CallLimiter] = None
+    ) -> List[Clause]:
+        """
+        Classify clauses concurrently, packing up to CLASSIFICATION_BATCH_SIZE clauses into each LLM call.
+
+        Args:
+            clauses (List[Clause]): The extracted clauses to classify
+            on_progress (Optional[Callable[[int, int], None]]): Called with (classified, total) as calls finish
+            limiter (Optional[CallLimiter]): Gates the calls; defaults to max_concurrency in flight
+
+        Returns:
+            List[Clause]: The classified clauses, in input order
+        """
+        limiter = limiter or CallLimiter(self.max_concurrency)
+
+        async def classify(start: int, chunk: List[Clause]) -> tuple[int, List[Clause]]:
+            agent = self.build_classification_agent()
+            result = await self._arun(agent, self.classification_prompt(chunk), limiter)
+            if not isinstance(result.content, ClauseClassificationList):
+                logger.warning(f"Unusable classification for clauses {start}-{start + len(chunk) - 1}, keeping them unclassified")
+                return start, chunk
+
+            # The model returns only a category per clause number; the extracted clauses
+            # keep their own text, so a paraphrased echo can never overwrite it
+            categories = {
+                item.clause: item.clause_category
+                for item in result.content.classifications
+                if 1 <= item.clause <= len(chunk)
+            }
+            if len(categories) != len(chunk):
+                logger.warning(f"Classified {len(categories)} of clauses {start}-{start + len(chunk) - 1}, keeping the rest unclassified")
+            return start, [
+                clause.model_copy(update={"clause_category": categories[number]}) if number in categories else clause
+                for number, clause in enumerate(chunk, 1)
+            ]
+
+        classified = list(clauses)
+        completed = 0
+        tasks = [
+            asyncio.create_task(classify(start, clauses[start:start + CLASSIFICATION_BATCH_SIZE]))
+            for start in range(0, len(clauses), CLASSIFICATION_BATCH_SIZE)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                start, chunk = await task
+                classified[start:start + len(chunk)] = chunk
+                completed += len(chunk)
+                if on_progress:
+                    on_progress(completed, len(clauses))
+        except BaseException:
+            # One failed chunk fails the contract, so the other calls would be wasted
+            for task in tasks:
+                task.cancel()
+            raise
+        return classified
+
+    def fill_entities(self, clauses: List[Clause]) -> List[Clause]:
+        """Set each clause's dates and amounts from its text, without an LLM call"""
+        filled = []
+        for clause in clauses:
+            dates, amounts = extract_entities(clause.clause_text)
+            filled.append(clause.model_copy(update={"related_dates": dates, "related_amounts": amounts}))
+        return filled
+
+    def metadata_prompt(self, text: str) -> str:
+        """Build the metadata extraction prompt for a contract's text"""
+        return METADATA_PROMPT.format(text=text)
+
+    def clause_prompt(self, text: str) -> str:
+        """Build the clause extraction prompt for a contract's text"""
+        return CLAUSE_PROMPT.format(text=text)
+
+    def classification_prompt(self, clauses: List[Clause]) -> str:
+        """Build one classification prompt for a numbered block of clauses"""
+        numbered = "\n".join(
+            f"Clause {number}: {clause.model_dump_json(include={'section_name', 'clause_text'})}"
+            for number, clause in enumerate(clauses, 1)
+        )
+        return CLASSIFICATION_PROMPT.format(count=len(clauses), numbered=numbered)
+
+    def generation_prompt(self, clauses: str) -> str:
+        """Build the clause improvement prompt from serialized classified clauses"""
+        return GENERATION_PROMPT.format(clauses=clauses)
+
+    def summary_prompt(self, metadata: str, clauses: str) -> str:
+        """Build the executive summary prompt from serialized metadata and clauses"""
+        return SUMMARY_PROMPT.format(metadata=metadata, clauses=clauses)
+
+    async def astream_summary(self, document: Contract) -> AsyncIterator[str]:
+        """
+        Stream the executive summary of a processed contract as it is generated.
+
+        Args:
+            document (Contract): A contract returned by process_pdf with summarize=False
+
+        Yields:
+            str: Summary text chunks in generation order
+        """
+        prompt = self.summary_prompt(
+            document.model_dump_json(exclude={"clauses", "summary"}),
+            ClauseList(clauses=document.clauses).model_dump_json()
+        )
+        # Streaming needs agno's async path; without an async_client it would open a
+        # new unpooled AsyncOpenAI per call and never close it
+        client = AsyncOpenAI(
+            api_key=self.openai_client.api_key,
+            max_retries=OPENAI_MAX_RETRIES,
+            timeout=OPENAI_TIMEOUT
+        )
+        try:
+            async for chunk in await self.build_summary_agent(client).arun(prompt, stream=True):
+                if chunk.content:
+                    yield chunk.content
+        finally:
+            await client.close()
+
+    def build_document(
+        self,
+        pdf_path: Path,
+        metadata: ContractMetadata,
+        clauses: List[Clause],
+        summary: str
+    ) -> Contract:
+        """Combine the pipeline's stage outputs into the final contract"""
+        # Every part was validated when its stage's JSON was parsed; skip a second pass
+        return Contract.model_construct(
+            pdf_name=pdf_path.name,
+            contract_title=metadata.contract_title,
+            contract_date=metadata.contract_date,
+            parties_involved=metadata.parties_involved,
+            clauses=clauses,
+            summary=summary,
+            amounts=metadata.amounts
         )
 
-    def process_pdf(self, pdf_path: str | Path) -> ProcessingResponse:
+    def process_pdf(
+        self,
+        pdf_path: str | Path,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        summarize: bool = True,
+        generate_alternatives: bool = False
+    ) -> ProcessingResponse:
         """Process a PDF file through the entire pipeline"""
+        return asyncio.run(self.aprocess_pdf(
+            pdf_path, on_progress=on_progress, summarize=summarize, generate_alternatives=generate_alternatives
+        ))
+
+    async def aprocess_pdf(
+        self,
+        pdf_path: str | Path,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        summarize: bool = True,
+        generate_alternatives: bool = False,
+        limiter: Optional[CallLimiter] = None
+    ) -> ProcessingResponse:
+        """Process a PDF file through the entire pipeline, parsing it off the event loop"""
         try:
             logger.info(f"Starting PDF processing for file: {pdf_path}")
 
@@ -134,14 +417,300 @@ class ContractProcessingAgent:
 
             # Extract text from PDF
             logger.info("Extracting text from PDF")
-            text = self.pdf_parser.parse_pdf(pdf_path)
+            text = await asyncio.to_thread(self.pdf_parser.parse_pdf, pdf_path)
             logger.debug(f"Extracted text length: {len(text)}")
             # logger.debug(f"First 500 chars of text: {text[:500]}")
 
 
             # Process the extracted text
             logger.info("Processing extracted text through contract pipeline")
-            return self.process_contract(text, pdf_path)
+            return await self.aprocess_contract(
+                text, pdf_path, on_progress=on_progress, summarize=summarize,
+                generate_alternatives=generate_alternatives, limiter=limiter
+            )
+
+        except Exception as e:
+            logger.error(f"PDF processing failed: {str(e)}", exc_info=True)
+            return ProcessingResponse(
+                status="error",
+                error=f"PDF processing failed: {str(e)}",
+                document=None
+            )
+
+    def process_pdfs(
+        self,
+        pdf_paths: Sequence[str | Path],
+        max_concurrency: int = 10,
+        rpm: Optional[int] = 500,
+        on_result: Optional[Callable[[Path, ProcessingResponse], None]] = None,
+        generate_alternatives: bool = False
+    ) -> List[ProcessingResponse]:
+        """Process several PDF files concurrently; see aprocess_pdfs"""
+        return asyncio.run(self.aprocess_pdfs(pdf_paths, max_concurrency, rpm, on_result, generate_alternatives))
+
+    async def aprocess_pdfs(
+        self,
+        pdf_paths: Sequence[str | Path],
+        max_concurrency: int = 10,
+        rpm: Optional[int] = 500,
+        on_result: Optional[Callable[[Path, ProcessingResponse], None]] = None,
+        generate_alternatives: bool = False
+    ) -> List[ProcessingResponse]:
+        """
+        Process several PDF files concurrently, across contracts and pipeline stages.
+
+        A single limiter gates every LLM call of every contract, so the whole
+        batch stays within the provider's concurrency and per-minute limits.
+        Rate-limited calls are retried with exponential backoff by the OpenAI client.
+
+        Args:
+            pdf_paths (Sequence[str | Path]): The PDF files to process
+            max_concurrency (int): Maximum LLM calls in flight across the batch
+            rpm (Optional[int]): Maximum LLM calls started per minute, None to disable
+            on_result (Optional[Callable[[Path, ProcessingResponse], None]]): Called as each contract finishes
+            generate_alternatives (bool): Also rewrite clauses with improved wording, one extra LLM call
+
+        Returns:
+            List[ProcessingResponse]: One result per input file, in input order
+        """
+        limiter = CallLimiter(max_concurrency, rpm)
+
+        async def process(pdf_path: Path) -> ProcessingResponse:
+            result = await self.aprocess_pdf(pdf_path, generate_alternatives=generate_alternatives, limiter=limiter)
+            if on_result:
+                on_result(pdf_path, result)
+            return result
+
+        return await asyncio.gather(*[process(Path(pdf_path)) for pdf_path in pdf_paths])
+
+    async def astream_pdfs(
+        self,
+        pdf_paths: Sequence[str | Path],
+        max_concurrency: int = 10,
+        rpm: Optional[int] = 500,
+        generate_alternatives: bool = False
+    ) -> AsyncIterator[Tuple[Path, ProcessingResponse]]:
+        """
+        Process several PDF files concurrently, yielding each result as soon as it is ready.
+
+        Unlike aprocess_pdfs, results arrive in completion order, so callers can
+        persist or display a contract without waiting for the slowest one.
+
+        Args:
+            pdf_paths (Sequence[str | Path]): The PDF files to process
+            max_concurrency (int): Maximum LLM calls in flight across the batch
+            rpm (Optional[int]): Maximum LLM calls started per minute, None to disable
+            generate_alternatives (bool): Also rewrite clauses with improved wording, one extra LLM call
+
+        Yields:
+            Tuple[Path, ProcessingResponse]: Each input file with its result, in completion order
+        """
+        limiter = CallLimiter(max_concurrency, rpm)
+
+        async def process(pdf_path: Path) -> Tuple[Path, ProcessingResponse]:
+            return pdf_path, await self.aprocess_pdf(
+                pdf_path, generate_alternatives=generate_alternatives, limiter=limiter
+            )
+
+        tasks = [asyncio.create_task(process(Path(pdf_path))) for pdf_path in pdf_paths]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # A consumer that stops early should not leave contracts running
+            for task in tasks:
+                task.cancel()
+
+    def batch_template(self, agent: Agent) -> Dict[str, Any]:
+        """Build the prompt-independent part of the Batch API body equivalent to agent.run"""
+        system_message = agent.get_system_message()
+        system_prompt = system_message.content if system_message else ""
+        body: Dict[str, Any] = {
+            "model": agent.model.id,
+            "temperature": agent.model.temperature,
+            "messages": []
+        }
+        if agent.response_model is not None:
+            schema = response_schema_json(agent.response_model)
+            system_prompt += f"\n\nRespond with a JSON object matching this JSON schema:\n{schema}"
+            body["response_format"] = {"type": "json_object"}
+        if system_prompt:
+            body["messages"].append({"role": "system", "content": system_prompt.strip()})
+        return body
+
+    def run_stage_batch(self, requests: Dict[str, Tuple[Agent, str]], poll_interval: float) -> Dict[str, Any]:
+        """
+        Run one pipeline stage for many contracts as a single Batch API job.
+
+        Args:
+            requests (Dict[str, Tuple[Agent, str]]): (agent, prompt) pairs keyed by custom_id
+            poll_interval (float): Seconds between batch status checks
+
+        Returns:
+            Dict[str, Any]: Each agent's parsed output keyed by custom_id; failed requests are omitted
+        """
+        # A stage sends the same system prompt and schema with every request; build them once per agent
+        templates: Dict[int, Dict[str, Any]] = {}
+        bodies = {}
+        for custom_id, (agent, prompt) in requests.items():
+            if id(agent) not in templates:
+                templates[id(agent)] = self.batch_template(agent)
+            template = templates[id(agent)]
+            bodies[custom_id] = {**template, "messages": [*template["messages"], {"role": "user", "content": prompt}]}
+        outputs = {}
+        for custom_id, content in run_chat_batch(self.openai_client, bodies, poll_interval).items():
+            response_model = requests[custom_id][0].response_model
+            if response_model is None:
+                outputs[custom_id] = content
+                continue
+            try:
+                outputs[custom_id] = response_model.model_validate_json(content)
+            except ValidationError as e:
+                logger.warning(f"Discarding invalid batch output for {custom_id}: {e}")
+        return outputs
+
+    def process_pdfs_batch(
+        self,
+        pdf_paths: Sequence[str | Path],
+        poll_interval: float = 60.0,
+        generate_alternatives: bool = False
+    ) -> List[ProcessingResponse]:
+        """
+        Process many PDF files offline through OpenAI's Batch API.
+
+        Batch requests cost half as much as live calls and do not count against
+        the live rate limits, but may take up to 24 hours. Each stage needs the
+        previous stage's output, so the pipeline runs as one batch job per stage
+        across all contracts. Classification stays on live DeepSeek calls, which
+        the OpenAI Batch API cannot serve.
+
+        Args:
+            pdf_paths (Sequence[str | Path]): The PDF files to process
+            poll_interval (float): Seconds between batch status checks
+            generate_alternatives (bool): Also rewrite clauses with improved wording, one extra LLM call
+
+        Returns:
+            List[ProcessingResponse]: One result per input file, in input order
+        """
+        paths = [Path(pdf_path) for pdf_path in pdf_paths]
+        errors: Dict[int, str] = {}
+
+        def pending() -> List[int]:
+            return [index for index in range(len(paths)) if index not in errors]
+
+        def collect(stage: str, outputs: Dict[str, Any]) -> Dict[int, Any]:
+            for index in pending():
+                if f"{index}:{stage}" not in outputs:
+                    errors[index] = f"Contract processing failed: no valid {stage} output from batch"
+            return {index: outputs[f"{index}:{stage}"] for index in pending()}
+
+        texts: Dict[int, str] = {}
+        for index, pdf_path in enumerate(paths):
+            try:
+                texts[index] = self.pdf_parser.parse_pdf(pdf_path)
+            except Exception as e:
+                logger.error(f"PDF processing failed for {pdf_path}: {str(e)}", exc_info=True)
+                errors[index] = f"PDF processing failed: {str(e)}"
+
+        # 1-2. Metadata and clause extraction share one batch
+        logger.info("Batch steps 1-2: Extracting contract metadata and clauses")
+        parsing_agent, clause_agent = self.build_parsing_agent(), self.build_clause_agent()
+        requests = {}
+        for index in pending():
+            requests[f"{index}:metadata"] = (parsing_agent, self.metadata_prompt(texts[index]))
+            requests[f"{index}:clauses"] = (clause_agent, self.clause_prompt(texts[index]))
+        outputs = self.run_stage_batch(requests, poll_interval)
+        metadata = collect("metadata", outputs)
+        clauses = collect("clauses", outputs)
+
+        # 3. Classify clauses with live DeepSeek calls, bounded across all contracts
+        logger.info("Batch step 3: Classifying clauses")
+
+        async def classify_all() -> List[List[Clause]]:
+            limiter = CallLimiter(self.max_concurrency)
+            return await asyncio.gather(*[
+                self.aclassify_clauses(clauses[index].clauses, limiter=limiter) for index in pending()
+            ])
+
+        classified = {
+            index: ClauseList(clauses=self.fill_entities(result))
+            for index, result in zip(pending(), asyncio.run(classify_all()))
+        }
+
+        # 4-5. Summaries describe the contracts as written, so they share a batch
+        # with the optional clause generation instead of waiting a round for it
+        logger.info("Batch steps 4-5: Creating contract summaries" + (
+            " and generating alternative clauses" if generate_alternatives else ""
+        ))
+        summary_agent = self.build_summary_agent()
+        requests = {
+            f"{index}:summary": (
+                summary_agent, self.summary_prompt(metadata[index].model_dump_json(), classified[index].model_dump_json())
+            )
+            for index in pending()
+        }
+        if generate_alternatives:
+            generation_agent = self.build_generation_agent()
+            for index in pending():
+                requests[f"{index}:generation"] = (
+                    generation_agent, self.generation_prompt(classified[index].model_dump_json())
+                )
+        outputs = self.run_stage_batch(requests, poll_interval)
+        generated = collect("generation", outputs) if generate_alternatives else classified
+        summaries = collect("summary", outputs)
+
+        # 6. Combine results
+        results = []
+        for index, pdf_path in enumerate(paths):
+            if index in errors:
+                results.append(ProcessingResponse(status="error", error=errors[index], document=None))
+                continue
+            try:
+                document = self.build_document(pdf_path, metadata[index], generated[index].clauses, summaries[index])
+                results.append(ProcessingResponse(status="success", error=None, document=document))
+            except Exception as e:
+                results.append(ProcessingResponse(
+                    status="error",
+                    error=f"Contract processing failed: {str(e)}",
+                    document=None
+                ))
+        return results
+
+    def process_bytes(
+        self,
+        name: str,
+        data: bytes,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        summarize: bool = True,
+        generate_alternatives: bool = False
+    ) -> ProcessingResponse:
+        """
+        Process an in-memory PDF, such as an upload, without writing it to disk.
+
+        Args:
+            name (str): The original file name, reported as pdf_name
+            data (bytes): The raw PDF bytes
+            on_progress (Optional[Callable[[int, int], None]]): Clause classification progress callback
+            summarize (bool): Generate the summary inline; pass False to stream it later via astream_summary
+            generate_alternatives (bool): Also rewrite clauses with improved wording, one extra LLM call
+
+        Returns:
+            ProcessingResponse: Processing result with either the structured contract data or error
+        """
+        try:
+            logger.info(f"Starting PDF processing for upload: {name} ({len(data)} bytes)")
+
+            # Extract text from PDF
+            logger.info("Extracting text from PDF")
+            text = self.pdf_parser.parse_pdf(data)
+            logger.debug(f"Extracted text length: {len(text)}")
+
+            # Process the extracted text
+            logger.info("Processing extracted text through contract pipeline")
+            return self.process_contract(
+                text, Path(name), on_progress=on_progress, summarize=summarize,
+                generate_alternatives=generate_alternatives
+            )
 
         except Exception as e:
             logger.error(f"PDF processing failed: {str(e)}", exc_info=True)
@@ -151,320 +720,150 @@ class ContractProcessingAgent:
                 document=None
             )
 
-    def process_contract(self, text: str, pdf_path: Path) -> ProcessingResponse:
+    def process_contract(
+        self,
+        text: str,
+        pdf_path: Path,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        summarize: bool = True,
+        generate_alternatives: bool = False
+    ) -> ProcessingResponse:
+        """Synchronous wrapper around aprocess_contract"""
+        return asyncio.run(self.aprocess_contract(
+            text, pdf_path, on_progress=on_progress, summarize=summarize,
+            generate_alternatives=generate_alternatives
+        ))
+
+    async def aprocess_contract(
+        self,
+        text: str,
+        pdf_path: Path,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        summarize: bool = True,
+        generate_alternatives: bool = False,
+        limiter: Optional[CallLimiter] = None
+    ) -> ProcessingResponse:
         """
         Process a contract document through the entire pipeline of agents.
 
+        Stages without a data dependency on each other run concurrently. Contracts
+        whose text matches, ignoring whitespace, run the pipeline once per
+        processor, including duplicates that are processed at the same time.
+
         Args:
             text (str): The raw text content of the contract
             pdf_path (Path): The path to the PDF file
+            on_progress (Optional[Callable[[int, int], None]]): Clause classification progress callback
+            summarize (bool): Generate the summary inline; pass False to stream it later via astream_summary
+            generate_alternatives (bool): Also rewrite clauses with improved wording, one extra LLM call
+            limiter (Optional[CallLimiter]): Gates the LLM calls; defaults to max_concurrency in flight
 
         Returns:
             ProcessingResponse: Processing result with either the structured contract data or error
         """
+        key = (contract_text_key(text), summarize, generate_alternatives)
+        result = self.result_cache.get(key)
+        if result is None:
+            task = self.pending_results.get(key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = asyncio.ensure_future(self._aprocess_contract(
+                    text, pdf_path, on_progress, summarize, generate_alternatives, limiter
+                ))
+                self.pending_results[key] = task
+                task.add_done_callback(lambda done: self.pending_results.pop(key, None))
+            # Shielded so one caller giving up does not cancel a duplicate's pipeline;
+            # the last caller to give up cancels it, so no LLM calls outlive their callers
+            self.pending_waiters[task] = self.pending_waiters.get(task, 0) + 1
+            try:
+                result = await asyncio.shield(task)
+            finally:
+                self.pending_waiters[task] -= 1
+                if not self.pending_waiters[task]:
+                    del self.pending_waiters[task]
+                    task.cancel()
+            if result.status == "success":
+                self.cache_result(key, result)
+
+        if result.document is not None and result.document.pdf_name != pdf_path.name:
+            document = result.document.model_copy(update={"pdf_name": pdf_path.name})
+            result = result.model_copy(update={"document": document})
+        return result
+
+    def cache_result(self, key: Tuple[str, bool, bool], result: ProcessingResponse) -> None:
+        """Remember a successful result, evicting the oldest beyond RESULT_CACHE_SIZE"""
+        self.result_cache[key] = result
+        if len(self.result_cache) > RESULT_CACHE_SIZE:
+            del self.result_cache[next(iter(self.result_cache))]
+
+    async def _aprocess_contract(
+        self,
+        text: str,
+        pdf_path: Path,
+        on_progress: Optional[Callable[[int, int], None]],
+        summarize: bool,
+        generate_alternatives: bool,
+        limiter: Optional[CallLimiter]
+    ) -> ProcessingResponse:
+        """Run the full pipeline for one contract, bypassing the result cache"""
+        limiter = limiter or CallLimiter(self.max_concurrency)
         try:
             # 1. Extract and structure contract metadata
-            logger.info("Step 1: Extracting contract metadata")
-            metadata_prompt = f"""
-            AI Document Parser: Extract contract metadata and structure with prescribed format.
-
-            1. Extract Contract Metadata:
-            - Title: Full contract title (exact)
-            - Date: Official start date
-            - Parties: Extract name and role for each party
-            Format: {{"party_name": "Company A", "role": "Service Provider"}}
-
-            2. Extract Major Sections:
-            - Category: Legal function (Financial, Termination, etc.)
-            - Name: Exact heading/title
-            - Text: Full clause content
-            - Dates: Leave for NER processing
-            - Amounts: Leave for NER processing
-            - Metadata: Include confidence score
-
-            3. Output Requirements:
-            ✓ Success Format:
-            - "status": "success"
-            - "document": {{ structured contract output }}
-
-            ✗ Error Format:
-            - "status": "failed"
-            - "error": "Specific error message"
-
-            Flag any missing/unclear data with "warning" field.
-
-            Text: {text}
-            """
-
-            metadata_result = self.parsing_agent.run(metadata_prompt)
-            logger.debug(f"Raw metadata result: {metadata_result}")
-            logger.debug(f"Metadata type: {type(metadata_result)}")
-            logger.info(f"Metadata extraction result: {metadata_result.content if hasattr(metadata_result, 'content') else metadata_result}")
-
-            print(f"metadata_result type: {type(metadata_result)}")
-            print(f"metadata_result dir: {dir(metadata_result)}")
-
-            # 2. Extract clauses
-            logger.info("Step 2: Extracting clauses")
-
-            clause_prompt = f"""
-            Extract and structure clauses with:
-
-            1. Structure Requirements:
-            - clause: sequential number
-            - section_name: section header/name
-            - clause_text: complete text
-            - related_dates: [YYYY-MM-DD format]
-            - related_amounts: [monetary values with currency]
-            - metadata: {{ confidence_score: float 0-1 }}
-
-            2. Output Format:
-            {{
-                "clauses": [
-                    {{
-                        "clause": 1,
-                        "section_name": "NATURE OF RELATIONSHIP",
-                        "clause_text": "...",
-                        "related_dates": ["2025-03-01"],
-                        "related_amounts": ["$50,000"],
-                        "metadata": {{ "confidence_score": 0.95 }}
-                    }}
-                ]
-            }}
-
-            3. Guidelines:
-            - Preserve original formatting/numbering
-            - Use YYYY-MM-DD for dates
-            - Include currency symbols
-            - Maintain section hierarchy
-            - Flag incomplete/ambiguous clauses
-
-            Text: {text}
-            """
-
-            clauses_result = self.clause_agent.run(clause_prompt)
-            logger.debug(f"Raw clauses result: {clauses_result}")
-            logger.debug(f"Clauses type: {type(clauses_result)}")
-            logger.info(f"Clause extraction result: {clauses_result.content if hasattr(clauses_result, 'content') else clauses_result}")
-
-            # 3. Classify clauses
-            logger.info("Step 3: Classifying clauses")
+            logger.info("Steps 1-2: Extracting contract metadata and clauses")
+            metadata_prompt = self.metadata_prompt(text)
 
-            classification_prompt = f"""
-            IMPORTANT: Return pure JSON matching exactly this structure:
-            {{
-                "clause_category": "string",
-                "clause_name": "string",
-                "section_name": "string",
-                "clause_text": "string",
-                "related_dates": ["string"],
-                "related_amounts": ["string"],
-                "metadata": {{
-                    "confidence_score": 0.95
-                }}
-            }}
-
-            1. Legal Categories:
-            - Financial Terms: Payment, Fees, Compensation, Penalties
-            - Confidentiality & NDA: Data Protection, Trade Secrets, Non-Disclosure
-            - Termination & Breach: Exit Clauses, Rights, Auto-Renewals
-            - Indemnification & Liability: Risk Allocation, Damages
-            - Dispute Resolution: Arbitration, Mediation, Jurisdiction
-            - Rights & Restrictions: Ownership, IP, Licensing, Non-Compete
-            - Miscellaneous: Other clauses not fitting above categories
-
-            2. Classification Rules:
-            - Use primary function for multi-category clauses
-            - Label unclear clauses as "Miscellaneous"
-            - Preserve original text and structure
-            - Add warnings for uncertain classifications
-
-            Input Clauses: {clauses_result.content}
-            FINAL REMINDER: Return only the JSON object, no markdown, no code blocks.
-            """
-
-            classified_clauses = self.classification_agent.run(classification_prompt)
-            logger.info(f"Classification result: {classified_clauses.content if hasattr(classified_clauses, 'content') else classified_clauses}")
-
-
-            # 4. Extract entities from each clause
-            logger.info("Step 4: Extracting named entities")
-
-            ner_prompt = f"""
-            1. Entity Extraction Requirements:
-            - Dates (related_dates):
-            * Contract dates, deadlines, renewals
-            * Convert relative to explicit dates
-            * Format: ["YYYY-MM-DD"]
-
-            - Amounts (amounts):
-            * Financial values with currency
-            * Include percentages and fees
-            * Format: ["$10,000", "2%"]
-
-            - Parties (parties_involved):
-            * Names and roles
-            * Format: [
-                {{ "party_name": "ABC Corp", "role": "Provider" }}
-                ]
-
-            - Jurisdiction:
-            * Legal jurisdiction references
-            * Flag multiple jurisdictions
-
-            2. Output Format:
-            {{
-                "related_dates": ["2025-03-01"],
-                "amounts": ["$50,000"],
-                "parties_involved": [
-                    {{ "party_name": "Name", "role": "Role" }}
-                ],
-                "warning": "optional_warning_message"
-            }}
-
-            3. Warning Cases:
-            - Unclear dates/amounts
-            - Ambiguous party roles
-            - Multiple jurisdictions
-            - Missing required data
-
-            Input Clauses: {classified_clauses.content}
-            """
-
-            enriched_clauses = self.ner_agent.run(ner_prompt)
-            logger.info(f"NER result: {enriched_clauses.content if hasattr(enriched_clauses, 'content') else enriched_clauses}")
-
-
-            # 5. Generate alternative clauses (optional)
-            logger.info("Step 5: Generating alternative clauses")
-            generation_prompt = f"""
-            1. Enhancement Requirements:
-            - Preserve legal intent
-            - Remove ambiguity/redundancy
-            - Ensure term definitions
-            - Validate external references
-
-            2. Improvement Guidelines:
-            - Make terms explicit
-            - Use legally binding language
-            - Simplify without losing accuracy
-            - Maintain document consistency
-
-            3. Output Format:
-            {{
-                "clauses": [
-                    {{
-                        "clause_category": "Category",
-                        "original_clause_text": "Original",
-                        "improved_clause_text": "Enhanced",
-                        "modification_reason": "Change explanation",
-                        "warning": "optional_warning"
-                    }}
-                ]
-            }}
-
-            4. Special Cases:
-            - Return optimal clauses as-is with justification
-            - Flag unclear external references
-            - Note undefined terms
-            - Mark ambiguous improvements
-
-            Input Clauses: {enriched_clauses.content}
-            """
-
-            generated_clauses = self.generation_agent.run(generation_prompt)
-            logger.debug(f"Raw generated result: {generated_clauses}")
-            logger.debug(f"Generated type: {type(generated_clauses)}")
-            logger.info(f"Generation result: {generated_clauses.content if hasattr(generated_clauses, 'content') else generated_clauses}")
-
-            # 6. Create contract summary
-            logger.info("Step 6: Creating contract summary")
-            summary_prompt = f"""
-            1. Core Elements:
-            - Basic: title, date, parties
-            - Scope: purpose, obligations
-            - Deliverables: services, expectations
-
-            2. Key Terms:
-            - Financial: payments, penalties, taxes
-            - Termination: conditions, renewals, notices
-            - Legal: dispute resolution, jurisdiction
-            - Confidentiality: NDAs, IP rights, restrictions
-
-            3. Risk Overview:
-            - Liability terms
-            - Risk level
-            - Critical obligations
-            - Potential issues
-
-            4. Output Format:
-            {{
-                "contract_title": "Title",
-                "contract_date": "Date",
-                "parties_involved": [
-                    {{ "party_name": "Name", "role": "Role" }}
-                ],
-                "summary": {{
-                    "agreement_scope": "Description",
-                    "financial_terms": {{
-                        "total_value": "Amount",
-                        "payment_schedule": "Schedule",
-                        "penalties": "Terms"
-                    }},
-                    "termination_terms": {{
-                        "notice_period": "Period",
-                        "penalties": "Terms"
-                    }},
-                    "confidentiality_terms": "Description",
-                    "risk_assessment": "Level and explanation"
-                }}
-            }}
-
-            Contract Metadata: {metadata_result.content}
-            Key Clauses: {generated_clauses.content}
-            """
-
-            summary_result = self.summary_agent.run(summary_prompt)
-            logger.debug(f"Raw summary result: {summary_result}")
-            logger.debug(f"Summary type: {type(summary_result)}")
-            logger.info(f"Summary result: {summary_result.content if hasattr(summary_result, 'content') else summary_result}")
-
-            # 7. Combine results
-            logger.info("Step 7: Combining all results")
-            try:
-                # Get metadata from RunResponse
-                metadata_content = metadata_result.content if hasattr(metadata_result, 'content') else metadata_result
-
-                # Get clauses from RunResponse
-                clauses_content = generated_clauses.content if hasattr(generated_clauses, 'content') else generated_clauses
-
-                # Get summary from RunResponse
-                summary_content = summary_result.content if hasattr(summary_result, 'content') else summary_result
-
-                # Add debug logging
-                logger.debug(f"Clauses content type: {type(clauses_content)}")
-                logger.debug(f"Clauses content: {clauses_content}")
-
-                contract_data = {
-                    "pdf_name": pdf_path.name,
-                    "contract_title": metadata_content.contract_title,
-                    "contract_date": metadata_content.contract_date,
-                    "parties_involved": metadata_content.parties_involved,
-                    "clauses": metadata_content.clauses,
-                    "summary": summary_content.summary,
-                    "amounts": metadata_content.amounts
-                }
-
-                return ProcessingResponse(
-                    status="success",
-                    error=None,
-                    document=Contract(**contract_data)
-                )
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parsing error: {e}")
-                logger.error(f"Raw metadata content: {metadata_result.content if hasattr(metadata_result, 'content') else metadata_result}")
-                logger.error(f"Raw clauses content: {generated_clauses.content if hasattr(generated_clauses, 'content') else generated_clauses}")
-                raise
+            # 2. Extract clauses, independent of the metadata so both run concurrently
+            clause_prompt = self.clause_prompt(text)
+
+            metadata_result, clauses_result = await asyncio.gather(
+                self._arun(self.build_parsing_agent(), metadata_prompt, limiter),
+                self._arun(self.build_clause_agent(), clause_prompt, limiter)
+            )
+            # Structured outputs hand back validated models, so there is no JSON to parse here
+            metadata_content = _parsed(metadata_result, ContractMetadata)
+            clauses_content = _parsed(clauses_result, ClauseList)
+            # Result bodies run to kilobytes; only format them when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Metadata extraction result: %s", metadata_content)
+                logger.debug("Clause extraction result: %s", clauses_content)
+
+            # 3. Classify clauses, then pull their dates and amounts out locally
+            logger.info("Step 3: Classifying clauses")
+            classified = await self.aclassify_clauses(clauses_content.clauses, on_progress, limiter)
+            classified_clauses = ClauseList(clauses=self.fill_entities(classified))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Classification result: %s", classified_clauses)
+
+            # 4-5. The summary describes the contract as written, not the rewritten
+            # clauses, so it starts now and runs alongside the optional generation
+            summary_task = None
+            if summarize:
+                logger.info("Step 5: Creating contract summary")
+                summary_prompt = self.summary_prompt(metadata_content.model_dump_json(), classified_clauses.model_dump_json())
+                summary_task = asyncio.create_task(self._arun(self.build_summary_agent(), summary_prompt, limiter))
+
+            generated_content = classified_clauses
+            if generate_alternatives:
+                logger.info("Step 4: Generating alternative clauses")
+                generation_prompt = self.generation_prompt(classified_clauses.model_dump_json())
+                try:
+                    generated_content = _parsed(
+                        await self._arun(self.build_generation_agent(), generation_prompt, limiter), ClauseList
+                    )
+                except BaseException:
+                    if summary_task:
+                        summary_task.cancel()
+                    raise
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Generation result: %s", generated_content)
+
+            # 6. Combine results, attaching the summary once it arrives
+            logger.info("Step 6: Combining all results")
+            document = self.build_document(pdf_path, metadata_content, generated_content.clauses, "")
+            if summary_task:
+                document.summary = _content(await summary_task)
+                logger.debug("Summary result: %s", document.summary)
+
+            return ProcessingResponse(status="success", error=None, document=document)
 
         except Exception as e:
             return ProcessingResponse(
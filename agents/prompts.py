@@ -0,0 +1,153 @@
+"""Prompt templates for the contract pipeline stages.
+
+Each template is a constant filled in with str.format per call, so literal
+braces in the JSON examples are doubled. Placeholders come last: OpenAI and
+DeepSeek cache matching request prefixes, so the static instructions of a
+stage are only billed and processed in full on its first call.
+"""
+
+METADATA_PROMPT = """
+AI Document Parser: Extract contract metadata and structure with prescribed format.
+
+1. Extract Contract Metadata:
+- Title: Full contract title (exact)
+- Date: Official start date
+- Parties: Extract name and role for each party
+Format: {{"party_name": "Company A", "role": "Service Provider"}}
+- Amounts: Contract-level monetary values as plain numbers
+
+2. Output Requirements:
+✓ Success Format:
+- "status": "success"
+- "document": {{ structured contract output }}
+
+✗ Error Format:
+- "status": "failed"
+- "error": "Specific error message"
+
+Flag any missing/unclear data with "warning" field.
+Lines starting with "## " are headings detected from the PDF layout; the marker is a layout hint, never copy it into field values.
+
+Text: {text}
+"""
+
+CLAUSE_PROMPT = """
+Extract and structure clauses with:
+
+1. Structure Requirements:
+- clause: sequential number
+- section_name: section header/name
+- clause_text: complete text
+- related_dates, related_amounts: leave empty, they are extracted from clause_text locally
+- metadata: {{ confidence_score: float 0-1 }}
+
+2. Output Format:
+{{
+    "clauses": [
+        {{
+            "clause": 1,
+            "section_name": "NATURE OF RELATIONSHIP",
+            "clause_text": "...",
+            "related_dates": [],
+            "related_amounts": [],
+            "metadata": {{ "confidence_score": 0.95 }}
+        }}
+    ]
+}}
+
+3. Guidelines:
+- Lines starting with "## " are headings detected from the PDF layout; start a new
+  clause at each one and use it as the section_name
+- Preserve original formatting/numbering
+- Maintain section hierarchy
+- Flag incomplete/ambiguous clauses
+
+Text: {text}
+"""
+
+CLASSIFICATION_PROMPT = """
+IMPORTANT: Return pure JSON matching exactly this structure:
+{{
+    "classifications": [
+        {{
+            "clause": 1,
+            "clause_category": "string"
+        }}
+    ]
+}}
+
+1. Legal Categories:
+- Financial Terms: Payment, Fees, Compensation, Penalties
+- Confidentiality & NDA: Data Protection, Trade Secrets, Non-Disclosure
+- Termination & Breach: Exit Clauses, Rights, Auto-Renewals
+- Indemnification & Liability: Risk Allocation, Damages
+- Dispute Resolution: Arbitration, Mediation, Jurisdiction
+- Rights & Restrictions: Ownership, IP, Licensing, Non-Compete
+- Miscellaneous: Other clauses not fitting above categories
+
+2. Classification Rules:
+- Use primary function for multi-category clauses
+- Label unclear clauses as "Miscellaneous"
+- Return only the clause number and category; do not repeat the clause text
+
+FINAL REMINDER: Return only the JSON object, no markdown, no code blocks.
+
+The "classifications" array must contain exactly {count} entries, one per input clause,
+each with the number the clause has below.
+Input Clauses:
+{numbered}
+"""
+
+GENERATION_PROMPT = """
+1. Enhancement Requirements:
+- Preserve legal intent
+- Remove ambiguity/redundancy
+- Ensure term definitions
+- Validate external references
+
+2. Improvement Guidelines:
+- Make terms explicit
+- Use legally binding language
+- Simplify without losing accuracy
+- Maintain document consistency
+
+3. Output Format:
+Return every input clause, in input order, with its fields unchanged except
+clause_text, which holds the improved wording.
+
+4. Special Cases:
+- Return optimal clauses as-is with justification
+- Flag unclear external references
+- Note undefined terms
+- Mark ambiguous improvements
+
+Input Clauses: {clauses}
+"""
+
+SUMMARY_PROMPT = """
+1. Core Elements:
+- Basic: title, date, parties
+- Scope: purpose, obligations
+- Deliverables: services, expectations
+
+2. Key Terms:
+- Financial: payments, penalties, taxes
+- Termination: conditions, renewals, notices
+- Legal: dispute resolution, jurisdiction
+- Confidentiality: NDAs, IP rights, restrictions
+
+3. Risk Overview:
+- Liability terms
+- Risk level
+- Critical obligations
+- Potential issues
+
+4. Output Format:
+A Markdown executive summary with one short section per area above:
+agreement scope, financial terms (total value, payment schedule, penalties),
+termination terms (notice period, penalties), confidentiality terms and
+risk assessment (level and explanation).
+
+Contract Metadata: {metadata}
+Key Clauses: {clauses}
+"""
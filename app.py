@@ -1,6 +1,6 @@
 import streamlit as st
-from pathlib import Path
-from agents.contract_processor import ContractProcessingAgent
+import plotly.io as pio
+from agents.contract_processor import ContractProcessingAgent, create_http_client
 from components.charts.category_chart import create_clause_category_chart
 from components.charts.confidence_chart import create_confidence_chart
 from components.charts.timeline_chart import create_timeline_chart
@@ -10,6 +10,14 @@ from utils.helpers import get_logger
 
 logger = get_logger(__name__)
 
+# Serialize figures for st.plotly_chart with orjson instead of the pure-Python encoder
+pio.json.config.default_engine = "orjson"
+
+@st.cache_resource
+def get_http_client():
+    """HTTP connection pool shared by every session's processor"""
+    return create_http_client()
+
 def init_session_state():
     """Initialize session state variables"""
     if 'openai_api_key' not in st.session_state:
@@ -62,7 +70,8 @@ def main():
                 try:
                     st.session_state.processor = ContractProcessingAgent(
                         openai_api_key=openai_api_key,
-                        deepseek_api_key=deepseek_api_key
+                        deepseek_api_key=deepseek_api_key,
+                        http_client=get_http_client()
                     )
                     st.success("✅ APIs Connected Successfully")
                 except Exception as e:
@@ -70,6 +79,12 @@ def main():
         else:
             st.warning("🔑 API Keys Required")
 
+        generate_alternatives = st.toggle(
+            "Suggest improved clause wording",
+            value=False,
+            help="Rewrites every clause for red-lining; adds an extra LLM call per contract"
+        )
+
     # Main content
     st.markdown("# 📑 Smart Contract Analyzer")
     st.markdown("""
@@ -89,10 +104,17 @@ def main():
     if uploaded_file:
         with st.spinner("🔄 Processing your contract..."):
             try:
-                with Path("temp.pdf").open("wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-                result = st.session_state.processor.process_pdf("temp.pdf")
+                progress = st.progress(0.0, text="Classifying clauses...")
+                result = st.session_state.processor.process_bytes(
+                    uploaded_file.name,
+                    uploaded_file.getvalue(),
+                    on_progress=lambda done, total: progress.progress(
+                        done / total, text=f"Classified {done}/{total} clauses"
+                    ),
+                    summarize=False,
+                    generate_alternatives=generate_alternatives
+                )
+                progress.empty()
 
                 if result.status == "success":
                     st.success("✅ Analysis Complete!")
@@ -130,9 +152,15 @@ def main():
                         else:
                             st.info("No timeline data available")
 
-                    # Summary section
+                    # Summary section, streamed once per upload and replayed on reruns
                     st.markdown("## 📋 Executive Summary")
-                    st.markdown(result.document.summary)
+                    summary_key = f"summary_{uploaded_file.file_id}"
+                    if summary_key in st.session_state:
+                        st.markdown(st.session_state[summary_key])
+                    else:
+                        st.session_state[summary_key] = st.write_stream(
+                            st.session_state.processor.astream_summary(result.document)
+                        )
 
                 else:
                     st.error(f"❌ Processing Error: {result.error}")
@@ -140,9 +168,6 @@ def main():
             except Exception as e:
                 st.error(f"❌ Analysis Failed: {str(e)}")
                 logger.error(f"Analysis failed: {str(e)}", exc_info=True)
-            finally:
-                if Path("temp.pdf").exists():
-                    Path("temp.pdf").unlink()
 
 
 if __name__ == "__main__":
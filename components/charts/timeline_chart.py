@@ -5,10 +5,9 @@ def create_timeline_chart(result):
     all_dates = []
     date_labels = []
     for clause in result.document.clauses:
-        if clause.related_dates:
-            for date in clause.related_dates:
-                all_dates.append(date)
-                date_labels.append(clause.clause_name)
+        for date in clause.parsed_dates():
+            all_dates.append(date)
+            date_labels.append(clause.clause_name)
 
     if not all_dates:
         return None
@@ -16,16 +15,15 @@ def create_timeline_chart(result):
     fig = go.Figure(data=[go.Scatter(
         x=all_dates,
         y=date_labels,
-        mode='markers+text',
+        mode='markers',
         marker=dict(
             size=15,
             color='#66B2FF',
             symbol='diamond',
             line=dict(color='#3399FF', width=2)
         ),
-        text=all_dates,
-        textposition="top center",
-        textfont=dict(size=12)
+        # Labels are formatted client-side from x/y instead of shipping a text array
+        hovertemplate='<b>%{y}</b><br>%{x|%Y-%m-%d}<extra></extra>'
     )])
 
     fig.update_layout(
@@ -42,6 +40,7 @@ def create_timeline_chart(result):
         height=max(300, len(all_dates) * 50),
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
-        showlegend=False
+        showlegend=False,
+        uirevision='timeline'
     )
     return fig
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import List, Optional
 from pydantic import BaseModel
 
@@ -17,6 +18,32 @@ class Clause(BaseModel):
     related_amounts: Optional[List[str]]
     metadata: ClauseMetadata
 
+    def parsed_dates(self) -> List[date]:
+        """related_dates parsed from YYYY-MM-DD, skipping values that are not ISO dates"""
+        parsed = []
+        for value in self.related_dates:
+            try:
+                parsed.append(date.fromisoformat(value))
+            except ValueError:
+                continue
+        return parsed
+
+class ClauseList(BaseModel):
+    clauses: List[Clause]
+
+class ClauseClassification(BaseModel):
+    clause: int
+    clause_category: str
+
+class ClauseClassificationList(BaseModel):
+    classifications: List[ClauseClassification]
+
+class ContractMetadata(BaseModel):
+    contract_title: str
+    contract_date: str
+    parties_involved: List[Party]
+    amounts: Optional[List[float]]
+
 class Contract(BaseModel):
     pdf_name: str
     contract_title: str
@@ -0,0 +1,15 @@
+from utils.entities import extract_entities
+
+
+def test_amount_excludes_trailing_comma():
+    assert extract_entities("pay $50,000, payable monthly") == ([], ["$50,000"])
+
+
+def test_amounts_in_a_list_are_not_duplicated():
+    _, amounts = extract_entities("fees of $1,000, $2,000, and $3,000.")
+    assert amounts == ["$1,000", "$2,000", "$3,000"]
+
+
+def test_amount_thousands_and_percent():
+    _, amounts = extract_entities("a fee of 1,250,000 USD plus 2.5% interest")
+    assert amounts == ["1,250,000 USD", "2.5%"]
@@ -0,0 +1,62 @@
+import orjson
+import time
+from typing import Any, Dict
+from openai import OpenAI
+from utils.helpers import get_logger
+
+logger = get_logger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def run_chat_batch(client: OpenAI, bodies: Dict[str, Dict[str, Any]], poll_interval: float = 60.0) -> Dict[str, str]:
+    """Run chat completions through the OpenAI Batch API and wait for the results.
+
+    Args:
+        client (OpenAI): The OpenAI client to submit the batch with.
+        bodies (Dict[str, Dict[str, Any]]): Chat completion request bodies keyed by custom_id.
+        poll_interval (float): Seconds between batch status checks.
+
+    Returns:
+        Dict[str, str]: The response message content keyed by custom_id. Requests that
+            failed inside the batch are omitted.
+
+    Raises:
+        RuntimeError: If the batch fails, expires or is cancelled.
+    """
+    if not bodies:
+        return {}
+
+    lines = [
+        orjson.dumps({"custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS_URL, "body": body})
+        for custom_id, body in bodies.items()
+    ]
+    batch_file = client.files.create(file=("batch.jsonl", b"\n".join(lines)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=CHAT_COMPLETIONS_URL,
+        completion_window="24h"
+    )
+    logger.info(f"Submitted batch {batch.id} with {len(lines)} requests")
+
+    while batch.status not in TERMINAL_STATUSES:
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+        logger.debug(f"Batch {batch.id} status: {batch.status}")
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    contents = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).content.splitlines():
+            record = orjson.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                contents[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                logger.warning(f"Batch request {record['custom_id']} failed: {record.get('error') or response}")
+    if batch.request_counts and batch.request_counts.failed:
+        logger.warning(f"Batch {batch.id}: {batch.request_counts.failed} requests failed")
+    return contents
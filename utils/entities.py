@@ -0,0 +1,71 @@
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+MONTH_NAMES = (
+    r"Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?"
+    r"|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?"
+)
+
+# Every date format and amount in one alternation, so a clause is scanned once. The
+# named group that matched tells which kind was found.
+ENTITY_PATTERN = re.compile(
+    # 2025-03-01
+    r"\b(?P<iso_year>\d{4})-(?P<iso_month>\d{1,2})-(?P<iso_day>\d{1,2})\b"
+    # 03/01/2025, month first as in US contracts
+    r"|\b(?P<num_month>\d{1,2})/(?P<num_day>\d{1,2})/(?P<num_year>\d{4})\b"
+    # March 1, 2025
+    r"|(?P<mf_month>" + MONTH_NAMES + r")\.?\s+(?P<mf_day>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<mf_year>\d{4})\b"
+    # 1 March 2025, 1st day of March, 2025
+    r"|\b(?P<df_day>\d{1,2})(?:st|nd|rd|th)?\s+(?:day\s+of\s+)?(?P<df_month>" + MONTH_NAMES + r")\.?,?\s+(?P<df_year>\d{4})\b"
+    # $50,000, $1.5M, USD 1.5 million, 2%, 10 percent. Digits end the integer part, so
+    # the comma in "$50,000, payable" is not taken as part of the amount
+    r"|(?P<amount>(?:[$€£]\s?|\b(?:USD|EUR|GBP)\s?)\d(?:[\d,]*\d)?(?:\.\d+)?(?:\s?(?:thousand|million|billion)\b|[KMB]\b)?"
+    r"|\b\d(?:[\d,]*\d)?(?:\.\d+)?(?:\s?%|\s(?:percent\b|(?:USD|EUR|GBP|dollars)\b)))",
+    re.IGNORECASE
+)
+
+
+def to_iso_date(year: str, month: str | int, day: str) -> Optional[str]:
+    """Build a YYYY-MM-DD string, or None when the parts are not a real date"""
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def match_date(match: re.Match) -> Optional[str]:
+    """The YYYY-MM-DD date an ENTITY_PATTERN date match denotes, if it is a valid date"""
+    if match["iso_year"]:
+        return to_iso_date(match["iso_year"], match["iso_month"], match["iso_day"])
+    if match["num_year"]:
+        return to_iso_date(match["num_year"], match["num_month"], match["num_day"])
+    if match["mf_year"]:
+        return to_iso_date(match["mf_year"], MONTHS[match["mf_month"][:3].lower()], match["mf_day"])
+    return to_iso_date(match["df_year"], MONTHS[match["df_month"][:3].lower()], match["df_day"])
+
+
+def extract_entities(text: str) -> Tuple[List[str], List[str]]:
+    """Find calendar dates and monetary amounts in text with a single scan.
+
+    Args:
+        text (str): The text to search, such as a clause.
+
+    Returns:
+        Tuple[List[str], List[str]]: Unique dates normalized to YYYY-MM-DD and unique
+            amounts as written, each in order of appearance. Impossible dates such
+            as 02/30/2025 are skipped.
+    """
+    dates, amounts = {}, {}
+    for match in ENTITY_PATTERN.finditer(text):
+        if match["amount"]:
+            amounts[match.group().strip()] = None
+        else:
+            iso = match_date(match)
+            if iso:
+                dates[iso] = None
+    return list(dates), list(amounts)
@@ -0,0 +1,75 @@
+import hashlib
+import orjson
+from pathlib import Path
+from typing import Any, Optional
+from agno.agent import Agent
+from utils.helpers import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """On-disk cache of agent responses, so identical prompts skip the API on re-runs"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+
+    def key(self, agent: Agent, prompt: str) -> str:
+        """Hash everything that shapes a response: model, system prompt, temperature and prompt.
+
+        Args:
+            agent (Agent): The agent that would answer the prompt.
+            prompt (str): The user prompt.
+
+        Returns:
+            str: A hex digest naming the cache entry.
+        """
+        system_message = agent.get_system_message()
+        parts = [
+            agent.model.id,
+            system_message.content if system_message else "",
+            str(getattr(agent.model, "temperature", None)),
+            prompt
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, agent: Agent, key: str) -> Optional[Any]:
+        """Return the cached content for a key, parsed into the agent's response model.
+
+        Args:
+            agent (Agent): The agent whose response model the content is parsed into.
+            key (str): The cache key from key().
+
+        Returns:
+            Optional[Any]: The cached content, or None on a miss or an unreadable entry.
+        """
+        try:
+            content = orjson.loads((self.cache_dir / f"{key}.json").read_bytes())
+            if agent.response_model is not None:
+                return agent.response_model.model_validate(content)
+            return content
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable LLM cache entry {key}: {e}")
+            return None
+
+    def put(self, agent: Agent, key: str, content: Any) -> None:
+        """Store a response's content; only well-formed responses are cached, best effort.
+
+        Args:
+            agent (Agent): The agent that produced the content.
+            key (str): The cache key from key().
+            content (Any): The response content, a response model instance or a string.
+        """
+        if agent.response_model is not None:
+            if not isinstance(content, agent.response_model):
+                return
+            content = content.model_dump(mode="json")
+        elif not isinstance(content, str):
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / f"{key}.json").write_bytes(orjson.dumps(content))
+        except OSError as e:
+            logger.warning(f"Could not cache LLM response: {e}")
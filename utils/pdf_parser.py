@@ -1,56 +1,250 @@
 import fitz  # PyMuPDF
+import hashlib
+import io
+import os
 import pdfplumber
 import pytesseract
 import re
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from PIL import Image, ImageOps
+from typing import Dict, List, Optional
+from utils.helpers import get_logger
+
+logger = get_logger(__name__)
+
+# A PDF on disk or its raw bytes already in memory
+PDFSource = Path | bytes
+
+
+def ocr_workers() -> int:
+    """OCR_CONCURRENCY clamped to at least 1, or the CPU count when unset or not an integer"""
+    try:
+        return max(1, int(os.environ["OCR_CONCURRENCY"]))
+    except (KeyError, ValueError):
+        return os.cpu_count() or 1
+
+
+# Pages OCRed at once; each runs its own tesseract process. Set OCR_CONCURRENCY to
+# cap it on shared hosts or raise it where tesseract runs remotely
+OCR_WORKERS = ocr_workers()
+# Pages already run in parallel, so tesseract's own OpenMP threads only contend for cores
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+# LSTM engine only, each page read as one uniform block of text
+TESSERACT_CONFIG = "--oem 1 --psm 6"
+# Enough resolution for body text; tesseract time grows with the pixel count
+OCR_DPI = 150
+
+# Bump when extraction or cleaning changes its output, so stale cache entries are ignored
+PARSER_VERSION = 7
+# Recently parsed documents also kept in memory, skipping the disk read
+MEMORY_CACHE_SIZE = 64
+
+# Short lines set in bold, or noticeably larger than the body text, are marked as
+# headings so the clause agent can split on them instead of guessing
+HEADING_MARKER = "## "
+HEADING_MAX_CHARS = 80
+HEADING_SIZE_RATIO = 1.15
+# Whitespace is collapsed by clean_text anyway, so MuPDF need not reconstruct it
+TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_WHITESPACE
+
+# Whitespace runs, page markers and signature lines, matched in one scan. Page
+# markers take \s+ because the runs inside them would have collapsed to one char.
+CLEAN_PATTERN = re.compile(r"(\s{2,})|Page\s+\d+|\d+\s+Page|(?i:-+\s*Signature\s*-+)")
+
+
+def clean_match(match: re.Match) -> str:
+    """Replacement for CLEAN_PATTERN: blank lines become one newline, other runs a space"""
+    run = match.group(1)
+    if run is None:
+        return ""
+    return "\n" if run.count("\n") == len(run) else " "
+
 
 class PDFParser:
-    def __init__(self):
-        pass
+    # cache_dir opts into an on-disk cache of parsed text keyed by a hash of the PDF
+    # bytes, e.g. ~/.cache/contract-lcm. Off by default: contracts are often
+    # confidential and entries are never evicted, so only bulk or dev runs persist them
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir
+        self.memory_cache: Dict[str, str] = {}
+
+    def open_pymupdf(self, file: PDFSource) -> fitz.Document:
+        """Open a PDF path or in-memory bytes with PyMuPDF"""
+        if isinstance(file, bytes):
+            return fitz.open(stream=file, filetype="pdf")
+        return fitz.open(file)
+
+    def open_pdfplumber(self, file: PDFSource) -> pdfplumber.PDF:
+        """Open a PDF path or in-memory bytes with pdfplumber"""
+        return pdfplumber.open(io.BytesIO(file) if isinstance(file, bytes) else file)
+
+    def extract_text_pymupdf(self, file: PDFSource, use_ocr: bool = False) -> str:
+        """Extract text using PyMuPDF, marking heading lines by their font size and weight.
+
+        With use_ocr, pages without a text layer are rendered while the document is
+        open and OCRed, so scanned and mixed PDFs need no second pass over the file.
+        """
+        with self.open_pymupdf(file) as doc:
+            pages = [page.get_text("dict", flags=TEXT_FLAGS)["blocks"] for page in doc]
+            scanned = {
+                number: self.render_page(doc[number])
+                for number, blocks in enumerate(pages)
+                if use_ocr and not self.has_text(blocks)
+            }
+        # OCR is best effort: a missing or failing tesseract leaves those pages empty
+        # rather than failing documents whose other pages have text
+        ocr_texts = {}
+        if scanned:
+            try:
+                ocr_texts = dict(zip(scanned, self.ocr_images(list(scanned.values()))))
+            except (pytesseract.TesseractNotFoundError, pytesseract.TesseractError, OSError) as e:
+                logger.warning(f"OCR failed, leaving {len(scanned)} page(s) without text: {e}")
 
-    def extract_text_pymupdf(self, file: Path) -> str:
-        """Extract text using PyMuPDF"""
-        doc = fitz.open(file)
-        return "\n".join([page.get_text("text") for page in doc]).strip()
+        # The body size is the one most characters are set in
+        sizes = Counter()
+        for blocks in pages:
+            for block in blocks:
+                for line in block["lines"]:
+                    for span in line["spans"]:
+                        sizes[round(span["size"], 1)] += len(span["text"])
+        body_size = sizes.most_common(1)[0][0] if sizes else 0
 
-    def extract_text_pdfplumber(self, file: Path) -> str:
+        # One flat list of lines joined once, rather than a string per page joined again
+        lines = []
+        for number, blocks in enumerate(pages):
+            if number in ocr_texts:
+                lines.append(ocr_texts[number])
+                continue
+            for block in blocks:
+                for line in block["lines"]:
+                    # Blank lines and trailing spaces would let clean_text fold a "\n"
+                    # into a space, pulling the next heading marker into this line
+                    text = "".join(span["text"] for span in line["spans"]).strip()
+                    if not text:
+                        continue
+                    if self.is_heading(line["spans"], text, body_size):
+                        text = HEADING_MARKER + text
+                    lines.append(text)
+        return "\n".join(lines).strip()
+
+    def has_text(self, blocks: list) -> bool:
+        """Whether a page's text blocks hold any visible text"""
+        return any(span["text"].strip() for block in blocks for line in block["lines"] for span in line["spans"])
+
+    def render_page(self, page: fitz.Page) -> Image.Image:
+        """Render a page for OCR as a PIL image, which OCR threads can encode safely"""
+        # Tesseract only reads luminance, so render one grey channel rather than three
+        pixmap = page.get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+        image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+        return ImageOps.autocontrast(image)
+
+    def is_heading(self, spans: list, text: str, body_size: float) -> bool:
+        """Whether a line looks like a section heading rather than body text"""
+        stripped = text.strip()
+        if not stripped or len(stripped) > HEADING_MAX_CHARS:
+            return False
+        visible = [span for span in spans if span["text"].strip()]
+        bold = all(span["flags"] & fitz.TEXT_FONT_BOLD for span in visible)
+        larger = min(span["size"] for span in visible) >= body_size * HEADING_SIZE_RATIO
+        return bold or larger
+
+    def extract_text_pdfplumber(self, file: PDFSource) -> str:
         """Extract text using pdfplumber"""
         text_list = []
-        with pdfplumber.open(file) as pdf:
+        with self.open_pdfplumber(file) as pdf:
             for page in pdf.pages:
                 text = page.extract_text()
                 if text:
                     text_list.append(text.strip())
         return "\n".join(text_list)
 
-    def extract_text_ocr(self, file: Path) -> str:
-        """Extract text using OCR"""
-        with pdfplumber.open(file) as pdf:
-            text_list = []
-            for page in pdf.pages:
-                image = page.to_image().original
-                text = pytesseract.image_to_string(image, lang="eng")
-                text_list.append(text.strip())
-        return "\n".join(text_list)
+    def ocr_images(self, images: List[Image.Image]) -> List[str]:
+        """OCR page images, one tesseract process per worker, returning text per image"""
+        if not images:
+            return []
+
+        # Each worker gets a contiguous run of pages and OCRs them in a single tesseract
+        # run, so the engine and language model load once per worker rather than per page
+        workers = min(OCR_WORKERS, len(images))
+        size = -(-len(images) // workers)
+        with tempfile.TemporaryDirectory() as directory:
+            # pytesseract runs the tesseract binary in a subprocess, so threads keep every core busy
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                batches = executor.map(
+                    lambda start: self.ocr_pages(images[start:start + size], Path(directory), start),
+                    range(0, len(images), size)
+                )
+                return [text for batch in batches for text in batch]
+
+    def ocr_pages(self, images: List[Image.Image], directory: Path, start: int) -> List[str]:
+        """OCR page images in one tesseract run, through a list file naming their PNGs"""
+        paths = []
+        for number, image in enumerate(images, start):
+            path = directory / f"page-{number}.png"
+            image.save(path)
+            paths.append(str(path))
+        list_file = directory / f"pages-{start}.txt"
+        list_file.write_text("\n".join(paths) + "\n", encoding="utf-8")
+
+        # Tesseract ends every page with a form feed; pad in case it skipped an image
+        text = pytesseract.image_to_string(str(list_file), lang="eng", config=TESSERACT_CONFIG)
+        texts = [page.strip() for page in text.split("\f")]
+        return (texts + [""] * len(images))[:len(images)]
 
     def clean_text(self, text: str) -> str:
-        """Clean extracted text"""
-        text = re.sub(r"\n{2,}", "\n", text)
-        text = re.sub(r"\s{2,}", " ", text)
-        text = re.sub(r"Page\s\d+|\d+\sPage", "", text)
-        text = re.sub(r"[-]+\s*Signature\s*[-]+", "", text, flags=re.IGNORECASE)
-        return text.strip()
-
-    def parse_pdf(self, file: Path, use_ocr: bool = True) -> str:
+        """Clean extracted text in a single regex pass"""
+        return CLEAN_PATTERN.sub(clean_match, text).strip()
+
+    def read_cache(self, key: str) -> Optional[str]:
+        """Return previously parsed text for a content hash, if cached"""
+        if key in self.memory_cache:
+            return self.memory_cache[key]
+        if self.cache_dir is None:
+            return None
+        try:
+            text = (self.cache_dir / f"{key}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+        self.remember(key, text)
+        return text
+
+    def remember(self, key: str, text: str) -> None:
+        """Keep parsed text in memory, evicting the oldest beyond MEMORY_CACHE_SIZE"""
+        self.memory_cache[key] = text
+        if len(self.memory_cache) > MEMORY_CACHE_SIZE:
+            del self.memory_cache[next(iter(self.memory_cache))]
+
+    def write_cache(self, key: str, text: str) -> None:
+        """Store parsed text under its content hash; caching is best effort"""
+        self.remember(key, text)
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / f"{key}.txt").write_text(text, encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not cache parsed text: {e}")
+
+    def parse_pdf(self, file: PDFSource, use_ocr: bool = True) -> str:
         """Main method to parse PDF with fallback to OCR if needed"""
         try:
-            # Try regular text extraction first
-            text = self.extract_text_pdfplumber(file) or self.extract_text_pymupdf(file)
+            # Read once; every extractor below works from the same bytes
+            data = file if isinstance(file, bytes) else Path(file).read_bytes()
+            key = f"{hashlib.blake2b(data, digest_size=32).hexdigest()}-v{PARSER_VERSION}"
+            cached = self.read_cache(key)
+            if cached is not None:
+                return cached
 
-            # If no text found and OCR is enabled, try OCR
-            if not text.strip() and use_ocr:
-                text = self.extract_text_ocr(file)
+            # PyMuPDF is several times faster than pdfplumber, which stays as a fallback.
+            # Pages without a text layer are OCRed in the same pass when OCR is enabled
+            text = self.extract_text_pymupdf(data, use_ocr) or self.extract_text_pdfplumber(data)
 
-            return self.clean_text(text)
+            text = self.clean_text(text)
+            if text:
+                self.write_cache(key, text)
+            return text
         except Exception as e:
             raise Exception(f"Error parsing PDF: {str(e)}")
\ No newline at end of file